@@ -1,8 +1,42 @@
-import us
+import operator
+from bisect import bisect_right
+import numpy as np
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Optional
 
-FIFTY_PERCENT_STATES = ["CA", "NY", "CT"]
+from tax_data import Brackets
+
+try:
+    from numba import njit, prange
+
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; the kernels then run as plain Python
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+FIFTY_PERCENT_STATES = frozenset({"CA", "NY", "CT"})
+MUNI_CATEGORIES = frozenset({"OtherTaxExempt", "SingleState"})
+_SKIP_STATES = frozenset({"GEN", "NONE"})
+MUNI_KEYS = (
+    "variableRateDemandNote",
+    "otherMunicipalSecurity",
+    "tenderOptionBond",
+    "investmentCompany",
+    "nonFinancialCompanyCommercialPaper",
+)
+_muni_get = operator.itemgetter(*MUNI_KEYS)
+FRAME_KEYS = [
+    "yield",
+    "minimumInitialInvestment",
+    "usTreasuryDebt",
+    "usGovernmentAgencyDebt",
+    *MUNI_KEYS,
+]
 
 
 @dataclass(frozen=True)
@@ -19,72 +53,135 @@ class YieldResults:
     tax_equivalent_yield: float
 
 
-def get_marginal_rate(income: float, brackets: List[Tuple[float, float]]) -> float:
+def get_marginal_rate(income: float, brackets: Brackets) -> float:
     """Finds the marginal rate (the rate for the last dollar earned)."""
-    current_rate = brackets[0][1]
-    for threshold, rate in brackets:
-        if income >= threshold:
-            current_rate = rate
-        else:
-            break
-    return current_rate
+    thresholds, rates = brackets
+    return rates[max(bisect_right(thresholds, income) - 1, 0)]
 
 
-def find_state_in_fund_name(fund: Dict[str, Any], state: str) -> bool:
-    if state in ["GEN", "NONE"]:
-        return False
+@lru_cache(maxsize=None)
+def _us_states():
+    """Imports the us package on first use; it isn't needed on every code path."""
+    import us
+
+    return us.states
+
+
+@lru_cache(maxsize=64)
+def _state_name_lower(state: str) -> Optional[str]:
+    """Lowercase state name to look for in fund names.
+
+    DC maps to "" so every fund counts as in-state; GEN, NONE and unknown
+    states map to None so none do.
+    """
+    if state in _SKIP_STATES:
+        return None
     if state == "DC":
-        return True
-    state_lookup = us.states.lookup(state)
+        return ""
+    state_lookup = _us_states().lookup(state)
     if not state_lookup:
-        return False
-    return state_lookup.name.lower() in fund["name"].lower()
+        return None
+    return state_lookup.name.lower()
+
+
+def _name_lc(fund: Dict[str, Any]) -> str:
+    name_lc = fund.get("_name_lc")
+    return name_lc if name_lc is not None else fund["name"].lower()
+
+
+def prepare_funds(funds: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalizes a fetched fund list in place, once per run.
+
+    Numeric fields become floats (missing or null as 0.0), and each fund
+    caches its lowercased name. The scoring functions read the numeric
+    fields directly, so funds must pass through here first.
+    """
+    for fund in funds:
+        for key in FRAME_KEYS:
+            fund[key] = float(fund.get(key) or 0)
+        fund["_name_lc"] = fund["name"].lower()
+    return funds
+
+
+def find_state_in_fund_name(fund: Dict[str, Any], state: str) -> bool:
+    state_name = _state_name_lower(state)
+    return state_name is not None and state_name in _name_lc(fund)
 
 
 def calculate_muni_percent(fund: Dict[str, Any]) -> float:
-    if fund.get("category") not in ["OtherTaxExempt", "SingleState"]:
+    if fund.get("category") not in MUNI_CATEGORIES:
         return 0.0
-    keys = [
-        "variableRateDemandNote",
-        "otherMunicipalSecurity",
-        "tenderOptionBond",
-        "investmentCompany",
-        "nonFinancialCompanyCommercialPaper",
-    ]
-    return sum(fund.get(key, 0) or 0 for key in keys)
+    return sum(_muni_get(fund))
 
 
 def calculate_ps(fund: Dict[str, Any], state: str) -> float:
-    in_state_muni = find_state_in_fund_name(fund, state)
-    muni_percent = calculate_muni_percent(fund)
-    if in_state_muni and (state.lower() != "nj" or muni_percent >= 0.8):
-        return muni_percent
-    return 0.0
+    return calculate_tax_proportions(fund, state).ps
 
 
 def calculate_pm(fund: Dict[str, Any], state: str) -> float:
-    in_state_muni = find_state_in_fund_name(fund, state)
-    return calculate_muni_percent(fund) if not in_state_muni else 0.0
+    return calculate_tax_proportions(fund, state).pm
 
 
 def calculate_pg(fund: Dict[str, Any], state: str) -> float:
-    usgo_percent = (fund.get("usTreasuryDebt", 0) or 0) + (
-        fund.get("usGovernmentAgencyDebt", 0) or 0
-    )
+    usgo_percent = fund["usTreasuryDebt"] + fund["usGovernmentAgencyDebt"]
     if state in FIFTY_PERCENT_STATES and usgo_percent < 0.5:
         return 0.0
     return usgo_percent
 
 
 def calculate_tax_proportions(fund: Dict[str, Any], state: str) -> TaxProportions:
-    ps, pm, pg = (
-        calculate_ps(fund, state),
-        calculate_pm(fund, state),
-        calculate_pg(fund, state),
-    )
+    in_state_muni = find_state_in_fund_name(fund, state)
+    muni_percent = calculate_muni_percent(fund)
+    if in_state_muni and (state.lower() != "nj" or muni_percent >= 0.8):
+        ps = muni_percent
+    else:
+        ps = 0.0
+    pm = 0.0 if in_state_muni else muni_percent
+    pg = calculate_pg(fund, state)
     return TaxProportions(ps, pm, pg, 1.0 - (ps + pm + pg))
 
 
+# Explicit signatures make numba compile (or load from cache) at import time.
+_RATE_YIELD_ARGS = "(" + ", ".join(["float64"] * 9) + ")"
+_COLUMN_ARGS = ", ".join(["float64[::1]"] * 8 + ["boolean[::1]"] * 2)
+_COMPUTE_ALL_SIGNATURE = (
+    f"void({_COLUMN_ARGS}, boolean, boolean, float64, float64, float64, float64, "
+    "float64[::1], float64[::1])"
+)
+
+
+def _rate_terms(
+    fed_rate: float, state_rate: float
+) -> Tuple[float, float, float, float]:
+    denom = 1 - fed_rate - state_rate
+    inv_denom = 1.0 / denom if denom > 0 else 0.0
+    return 1 - fed_rate, 1 - state_rate, denom, inv_denom
+
+
+@dataclass(frozen=True)
+class RateContext:
+    """Rate terms shared by every fund's yields, computed once per run."""
+
+    one_minus_fr: float
+    one_minus_sr: float
+    denom: float
+    inv_denom: float  # 0.0 when denom <= 0; TEY then falls back to the yield
+
+    @classmethod
+    def from_rates(cls, fed_rate: float, state_rate: float) -> "RateContext":
+        return cls(*_rate_terms(fed_rate, state_rate))
+
+
+@njit("Tuple((float64, float64))" + _RATE_YIELD_ARGS, cache=True, fastmath=True)
+def _yields(fund_yield, one_minus_fr, one_minus_sr, denom, inv_denom, ps, pm, pg, pt):
+    """Returns (after_tax_yield, tax_equivalent_yield) for one fund."""
+    exempt_after_tax = ps + pm * one_minus_sr + pg * one_minus_fr
+    after_tax = fund_yield * (exempt_after_tax + pt * denom)
+    if denom <= 0:
+        return after_tax, fund_yield
+    return after_tax, fund_yield * (exempt_after_tax * inv_denom + pt)
+
+
 def calculate_after_tax_yield(
     fund_yield: float,
     fed_rate: float,
@@ -94,12 +191,7 @@ def calculate_after_tax_yield(
     pg: float,
     pt: float,
 ) -> float:
-    return fund_yield * (
-        ps
-        + pm * (1 - state_rate)
-        + pg * (1 - fed_rate)
-        + pt * (1 - fed_rate - state_rate)
-    )
+    return _yields(fund_yield, *_rate_terms(fed_rate, state_rate), ps, pm, pg, pt)[0]
 
 
 def calculate_tax_equivalent_yield(
@@ -111,25 +203,26 @@ def calculate_tax_equivalent_yield(
     pg: float,
     pt: float,
 ) -> float:
-    denom = 1 - fed_rate - state_rate
-    if denom <= 0:
-        return fund_yield
-    return fund_yield * (
-        ps / denom + pm * (1 - state_rate) / denom + pg * (1 - fed_rate) / denom + pt
-    )
+    return _yields(fund_yield, *_rate_terms(fed_rate, state_rate), ps, pm, pg, pt)[1]
 
 
 def process_fund(
     fund: Dict[str, Any], state: str, fed_rate: float, state_rate: float
 ) -> Dict[str, Any]:
+    rates = RateContext.from_rates(fed_rate, state_rate)
     props = calculate_tax_proportions(fund, state)
     yields = YieldResults(
-        after_tax_yield=calculate_after_tax_yield(
-            fund["yield"], fed_rate, state_rate, props.ps, props.pm, props.pg, props.pt
-        ),
-        tax_equivalent_yield=calculate_tax_equivalent_yield(
-            fund["yield"], fed_rate, state_rate, props.ps, props.pm, props.pg, props.pt
-        ),
+        *_yields(
+            fund["yield"],
+            rates.one_minus_fr,
+            rates.one_minus_sr,
+            rates.denom,
+            rates.inv_denom,
+            props.ps,
+            props.pm,
+            props.pg,
+            props.pt,
+        )
     )
     return {**fund, **yields.__dict__}
 
@@ -139,6 +232,177 @@ def filter_funds(
 ) -> bool:
     if fund["minimumInitialInvestment"] > investment_amount:
         return False
-    if issuer and issuer.lower() not in fund["name"].lower():
+    if issuer and issuer.lower() not in _name_lc(fund):
         return False
     return True
+
+
+def build_fund_frame(funds: List[Dict[str, Any]], state: str) -> Dict[str, np.ndarray]:
+    """Packs the fund list into one array per field (structure-of-arrays)."""
+    frame = {
+        key: np.array([fund[key] for fund in funds], dtype=np.float64)
+        for key in FRAME_KEYS
+    }
+    state_name = _state_name_lower(state)
+    names_lower = [_name_lc(fund) for fund in funds]
+    frame["in_state"] = np.array(
+        [state_name is not None and state_name in name for name in names_lower],
+        dtype=bool,
+    )
+    frame["is_muni"] = np.array(
+        [fund.get("category") in MUNI_CATEGORIES for fund in funds], dtype=bool
+    )
+    frame["name_lower"] = np.array([_name_lc(fund) for fund in funds], dtype=np.str_)
+    return frame
+
+
+def filter_fund_frame(
+    frame: Dict[str, np.ndarray], investment_amount: float, issuer: Optional[str]
+) -> np.ndarray:
+    """Vectorized equivalent of filter_funds; returns a keep-mask over the frame."""
+    mask = frame["minimumInitialInvestment"] <= investment_amount
+    if issuer:
+        mask &= np.strings.find(frame["name_lower"], issuer.lower()) >= 0
+    return mask
+
+
+@njit(_COMPUTE_ALL_SIGNATURE, parallel=True, fastmath=True, cache=True)
+def _compute_all(
+    fund_yield,
+    ustd,
+    usad,
+    vrdn,
+    oms,
+    tob,
+    ic,
+    ncp,
+    is_muni,
+    in_state,
+    is_nj,
+    is_50pct,
+    one_minus_fr,
+    one_minus_sr,
+    denom,
+    inv_denom,
+    out_after_tax,
+    out_tax_equiv,
+):
+    """Fills out_after_tax/out_tax_equiv for every fund in the frame columns."""
+    has_denom = denom > 0
+    for i in prange(len(fund_yield)):
+        muni = vrdn[i] + oms[i] + tob[i] + ic[i] + ncp[i] if is_muni[i] else 0.0
+        usgo = ustd[i] + usad[i]
+        ps = muni if in_state[i] and (not is_nj or muni >= 0.8) else 0.0
+        pm = 0.0 if in_state[i] else muni
+        # Multiply by the gate instead of branching so the loop stays SIMD-friendly.
+        pg = usgo * (not is_50pct or usgo >= 0.5)
+        pt = 1.0 - (ps + pm + pg)
+        y = fund_yield[i]
+        exempt_after_tax = ps + pm * one_minus_sr + pg * one_minus_fr
+        out_after_tax[i] = y * (exempt_after_tax + pt * denom)
+        if has_denom:
+            out_tax_equiv[i] = y * (exempt_after_tax * inv_denom + pt)
+        else:
+            out_tax_equiv[i] = y
+
+
+def _numpy_fund_yields(
+    frame: Dict[str, np.ndarray], state: str, rates: RateContext
+) -> Tuple[np.ndarray, np.ndarray]:
+    muni = frame["is_muni"] * sum(frame[key] for key in MUNI_KEYS)
+    usgo = frame["usTreasuryDebt"] + frame["usGovernmentAgencyDebt"]
+    in_state = frame["in_state"]
+    if state.lower() == "nj":
+        in_state_qualifies = in_state & (muni >= 0.8)
+    else:
+        in_state_qualifies = in_state
+
+    ps = np.where(in_state_qualifies, muni, 0.0)
+    pm = np.where(in_state, 0.0, muni)
+    is_50pct = state in FIFTY_PERCENT_STATES
+    pg = usgo * ~(is_50pct & (usgo < 0.5))
+
+    # Most funds are fully taxable (ps = pm = pg = 0, pt = 1), where both yields
+    # reduce to a single multiply; only the mixed rows need the full formula.
+    fund_yield = frame["yield"]
+    after_tax = fund_yield * rates.denom
+    tax_equiv = fund_yield.copy()
+    mixed = np.flatnonzero((ps != 0) | (pm != 0) | (pg != 0))
+    if not len(mixed):
+        return after_tax, tax_equiv
+    y, ps, pm, pg = fund_yield[mixed], ps[mixed], pm[mixed], pg[mixed]
+    pt = 1.0 - (ps + pm + pg)
+    exempt_after_tax = ps + pm * rates.one_minus_sr + pg * rates.one_minus_fr
+    after_tax[mixed] = y * (exempt_after_tax + pt * rates.denom)
+    if rates.denom > 0:
+        tax_equiv[mixed] = y * (exempt_after_tax * rates.inv_denom + pt)
+    return after_tax, tax_equiv
+
+
+def calculate_fund_yields(
+    frame: Dict[str, np.ndarray], state: str, fed_rate: float, state_rate: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized equivalent of process_fund over a whole fund frame."""
+    rates = RateContext.from_rates(fed_rate, state_rate)
+    if not HAVE_NUMBA:
+        return _numpy_fund_yields(frame, state, rates)
+    after_tax = np.empty_like(frame["yield"])
+    tax_equiv = np.empty_like(frame["yield"])
+    _compute_all(
+        frame["yield"],
+        frame["usTreasuryDebt"],
+        frame["usGovernmentAgencyDebt"],
+        *(frame[key] for key in MUNI_KEYS),
+        frame["is_muni"],
+        frame["in_state"],
+        state.lower() == "nj",
+        state in FIFTY_PERCENT_STATES,
+        rates.one_minus_fr,
+        rates.one_minus_sr,
+        rates.denom,
+        rates.inv_denom,
+        after_tax,
+        tax_equiv,
+    )
+    return after_tax, tax_equiv
+
+
+def _top_indices(values: np.ndarray, top_n: int) -> np.ndarray:
+    """Indices of the top_n largest values, ordered as a stable descending sort."""
+    if len(values) <= top_n:
+        return np.argsort(-values, kind="stable")
+    cutoff = np.partition(values, len(values) - top_n)[len(values) - top_n]
+    candidates = np.flatnonzero(values >= cutoff)
+    return candidates[np.argsort(-values[candidates], kind="stable")][:top_n]
+
+
+def rank_funds(
+    funds: List[Dict[str, Any]],
+    state: str,
+    fed_rate: float,
+    state_rate: float,
+    investment_amount: Optional[float] = None,
+    issuer: Optional[str] = None,
+    top_n: int = 5,
+) -> List[Dict[str, Any]]:
+    """Returns the top_n funds by tax-equivalent yield, with yields attached.
+
+    When investment_amount is given, funds are first filtered as in filter_funds.
+    """
+    if not funds:
+        return []
+    frame = build_fund_frame(funds, state)
+    if investment_amount is not None:
+        keep = np.flatnonzero(filter_fund_frame(frame, investment_amount, issuer))
+        frame = {key: column[keep] for key, column in frame.items()}
+    else:
+        keep = np.arange(len(funds))
+    after_tax, tax_equiv = calculate_fund_yields(frame, state, fed_rate, state_rate)
+    top = _top_indices(tax_equiv, top_n)
+    return [
+        {
+            **funds[keep[i]],
+            **YieldResults(float(after_tax[i]), float(tax_equiv[i])).__dict__,
+        }
+        for i in top
+    ]
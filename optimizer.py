@@ -1,9 +1,11 @@
 import argparse
-import requests
-import json
+import importlib
+import orjson
 import os
+import threading
+from concurrent.futures import Future
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Tuple
 from rich.console import Console
 from rich.table import Table
@@ -12,10 +14,12 @@ from rich.prompt import Prompt, FloatPrompt, Confirm
 from rich import box
 
 # Local imports
-from tax_data import FEDERAL_BRACKETS, STATE_TAX_DATA
-from logic import get_marginal_rate, process_fund, filter_funds
+from tax_data import DEFAULT_STATE_BRACKETS, FEDERAL_BRACKETS, STATE_TAX_DATA
 
 CONFIG_PATH = os.path.expanduser("~/.mmf_optimizer_config.json")
+CACHE_PATH = os.path.expanduser("~/.mmf_cache")
+CACHE_EXPIRE_SECONDS = 3600
+FETCH_TIMEOUT_SECONDS = 10
 console = Console()
 
 
@@ -25,6 +29,9 @@ class Config:
     state_tax_rate: Optional[float] = None
     state: Optional[str] = None
     last_updated: str = ""
+    _saved: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def is_valid(self):
         if (
@@ -43,32 +50,82 @@ class Config:
     def load(cls):
         if os.path.exists(CONFIG_PATH):
             try:
-                with open(CONFIG_PATH, "r") as f:
-                    data = json.load(f)
-                    return cls(**data)
-            except (json.JSONDecodeError, TypeError, IOError):
+                with open(CONFIG_PATH, "rb") as f:
+                    config = cls(**orjson.loads(f.read()))
+                config._saved = config._settings()
+                return config
+            except (orjson.JSONDecodeError, TypeError, IOError):
                 pass
         return cls()
 
+    def _settings(self) -> Dict[str, Any]:
+        return {
+            k: v
+            for k, v in self.__dict__.items()
+            if not k.startswith("_") and k != "last_updated"
+        }
+
     def save(self):
-        data = {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
-        data["last_updated"] = datetime.now().isoformat()
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(data, f)
+        data = self._settings()
+        if data == self._saved and self.is_valid():
+            return
+        self.last_updated = data["last_updated"] = datetime.now().isoformat()
+        with open(CONFIG_PATH, "wb") as f:
+            f.write(orjson.dumps(data))
+        self._saved = self._settings()
 
 
 def get_fund_data(
     url: str = "https://moneymarket.fun/data/fundYields.json",
-) -> Optional[List[Dict[str, Any]]]:
-    """Retrieves fund data from a specified URL."""
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """Retrieves fund data from a specified URL.
+
+    Returns (data, None) on success and (None, error message) on failure,
+    without touching the console, so it can run on a worker thread.
+    requests and requests_cache are imported here, off the start-up path.
+    """
+    import requests
+    import requests_cache
+
     try:
-        with console.status("[bold green]Fetching fund data..."):
-            response = requests.get(url)
+        with requests_cache.CachedSession(
+            CACHE_PATH,
+            backend="sqlite",
+            expire_after=CACHE_EXPIRE_SECONDS,
+            cache_control=True,
+            stale_if_error=True,
+        ) as session:
+            response = session.get(url, timeout=FETCH_TIMEOUT_SECONDS)
             response.raise_for_status()
-            return response.json()
-    except requests.RequestException as e:
-        console.print(f"[bold red]Error:[/bold red] Failed to retrieve data: {e}")
-        return None
+            return orjson.loads(response.content), None
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
+        return None, f"Failed to retrieve data: {e}"
+
+
+def fetch_fund_data_in_background() -> Future:
+    """Starts get_fund_data on a daemon thread and returns a Future for its result.
+
+    A daemon thread is never joined at exit, so Ctrl-C or EOF at a prompt
+    doesn't wait for the download to finish.
+    """
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(get_fund_data())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="fetch-fund-data", daemon=True).start()
+    return future
+
+
+def preload_logic_in_background():
+    """Imports logic on a daemon thread so numpy, numba and the kernels load
+    while the user answers prompts; later imports of it then find it loaded."""
+    threading.Thread(
+        target=importlib.import_module, args=("logic",), name="load-logic", daemon=True
+    ).start()
 
 
 def display_top_funds(funds: List[Dict[str, Any]], investment_amount: float):
@@ -124,9 +181,10 @@ def get_tax_info(args: argparse.Namespace, config: Config) -> Tuple[float, float
         filing_status = Prompt.ask(
             "Filing Status", choices=["single", "married"], default="single"
         )
+        from logic import get_marginal_rate
 
         fed_rate = get_marginal_rate(income, FEDERAL_BRACKETS[filing_status])
-        state_brackets = STATE_TAX_DATA.get(state, [(0, 0.05)])
+        state_brackets = STATE_TAX_DATA.get(state, DEFAULT_STATE_BRACKETS)
         state_rate = get_marginal_rate(income, state_brackets)
 
         console.print(
@@ -156,7 +214,12 @@ def main():
     parser.add_argument("--issuer", type=str)
     args = parser.parse_args()
 
+    # Neither the download nor loading logic (numpy, numba and the compiled
+    # kernels) depends on any prompt answers; overlap both with them.
+    fund_future = fetch_fund_data_in_background()
+    preload_logic_in_background()
     console.clear()
+
     config = Config.load()
     fed_rate, state_rate, state = get_tax_info(args, config)
     inv_amt = args.investment_amount or FloatPrompt.ask("Enter Investment Amount ($)")
@@ -195,19 +258,20 @@ def main():
         )
     )
 
-    fund_data = get_fund_data()
+    from logic import prepare_funds, rank_funds
+
+    if fund_future.done():
+        fund_data, error = fund_future.result()
+    else:
+        with console.status("[bold green]Fetching fund data..."):
+            fund_data, error = fund_future.result()
+    if error:
+        console.print(f"[bold red]Error:[/bold red] {error}")
     if not fund_data:
         return
+    prepare_funds(fund_data)
 
-    processed = sorted(
-        [
-            process_fund(f, state, fed_rate, state_rate)
-            for f in fund_data
-            if filter_funds(f, inv_amt, issuer)
-        ],
-        key=lambda x: x["tax_equivalent_yield"],
-        reverse=True,
-    )
+    processed = rank_funds(fund_data, state, fed_rate, state_rate, inv_amt, issuer)
     if not processed:
         console.print("[yellow]No funds found.[/yellow]")
         return
@@ -1,6 +1,17 @@
+from typing import List, Tuple
+
+Brackets = Tuple[Tuple[float, ...], Tuple[float, ...]]
+
+
+def split_brackets(brackets: List[Tuple[float, float]]) -> Brackets:
+    """Sorts (threshold, rate) pairs into parallel (thresholds, rates) tuples."""
+    thresholds, rates = zip(*sorted(brackets))
+    return thresholds, rates
+
+
 # 2026 Federal Tax Brackets (Marginal Rates)
 # Data accounts for the "One Big Beautiful Bill Act" (OBBBA) making TCJA rates permanent.
-FEDERAL_BRACKETS = {
+_FEDERAL_BRACKETS = {
     "single": [
         (12400, 0.10),
         (50400, 0.12),
@@ -23,7 +34,7 @@ FEDERAL_BRACKETS = {
 
 # 2026 State Marginal Brackets
 # Thresholds are the START of the bracket.
-STATE_TAX_DATA = {
+_STATE_TAX_DATA = {
     "AL": [(0, 0.02), (500, 0.04), (3000, 0.05)],
     "AK": [(0, 0.0)],
     "AZ": [(0, 0.025)],
@@ -173,3 +184,11 @@ STATE_TAX_DATA = {
         (1000000, 0.1075),
     ],
 }
+
+FEDERAL_BRACKETS = {
+    status: split_brackets(brackets) for status, brackets in _FEDERAL_BRACKETS.items()
+}
+STATE_TAX_DATA = {
+    state: split_brackets(brackets) for state, brackets in _STATE_TAX_DATA.items()
+}
+DEFAULT_STATE_BRACKETS = split_brackets([(0, 0.05)])
@@ -1,11 +1,20 @@
 import pytest
+from tax_data import FEDERAL_BRACKETS, split_brackets
 from logic import (
+    RateContext,
+    _numpy_fund_yields,
+    build_fund_frame,
     find_state_in_fund_name,
+    get_marginal_rate,
     calculate_after_tax_yield,
     calculate_tax_equivalent_yield,
     calculate_ps,
     calculate_pm,
     calculate_pg,
+    filter_funds,
+    prepare_funds,
+    process_fund,
+    rank_funds,
 )
 
 
@@ -23,6 +32,34 @@ def test_find_state_in_fund_name():
     assert find_state_in_fund_name(gen_fund, "DC") is True
 
 
+def test_get_marginal_rate():
+    brackets = split_brackets([(0, 0.02), (500, 0.04), (3000, 0.05)])
+    assert get_marginal_rate(0, brackets) == 0.02
+    assert get_marginal_rate(499, brackets) == 0.02
+    assert get_marginal_rate(500, brackets) == 0.04
+    assert get_marginal_rate(100000, brackets) == 0.05
+    assert get_marginal_rate(30000, FEDERAL_BRACKETS["single"]) == 0.10
+    assert get_marginal_rate(100, FEDERAL_BRACKETS["single"]) == 0.10
+
+
+def test_prepare_funds_normalizes():
+    fund = {
+        "name": "Fidelity California Municipal Money Market Fund",
+        "category": "SingleState",
+        "yield": 2.5,
+        "variableRateDemandNote": 0.6,
+        "tenderOptionBond": None,
+    }
+    prepare_funds([fund])
+    assert fund["tenderOptionBond"] == 0.0
+    assert fund["usTreasuryDebt"] == 0.0
+    assert fund["_name_lc"] == "fidelity california municipal money market fund"
+    prepared = process_fund(fund, "CA", 0.24, 0.09)
+    assert prepared["after_tax_yield"] == pytest.approx(
+        calculate_after_tax_yield(2.5, 0.24, 0.09, 0.6, 0, 0, 0.4)
+    )
+
+
 def test_calculate_after_tax_yield():
     # yield=5.0, fed=0.2, state=0.1, Ps=0, Pm=0, Pg=0, Pt=1.0
     res = calculate_after_tax_yield(5.0, 0.2, 0.1, 0, 0, 0, 1.0)
@@ -52,6 +89,7 @@ def test_calculate_ps():
         "investmentCompany": 0.05,
         "nonFinancialCompanyCommercialPaper": 0.05,
     }
+    prepare_funds([fund])
     assert calculate_ps(fund, "NY") == pytest.approx(1.0)
     assert calculate_ps(fund, "CA") == 0
 
@@ -62,6 +100,7 @@ def test_calculate_pm():
         "name": "General Muni Fund",
         "variableRateDemandNote": 0.9,
     }
+    prepare_funds([fund])
     assert calculate_pm(fund, "NY") == 0.9
 
 
@@ -74,6 +113,128 @@ def test_calculate_pg():
     assert calculate_pg(fund_low, "CA") == 0
 
 
+def test_rank_funds_matches_process_fund():
+    funds = [
+        {
+            "ticker": "NYMM",
+            "name": "Vanguard New York Municipal Money Market Fund",
+            "yield": 3.0,
+            "category": "SingleState",
+            "variableRateDemandNote": 0.7,
+            "otherMunicipalSecurity": 0.2,
+        },
+        {
+            "ticker": "TSY",
+            "name": "Fidelity Treasury Money Market Fund",
+            "yield": 4.0,
+            "category": "Treasury",
+            "usTreasuryDebt": 0.9,
+            "usGovernmentAgencyDebt": None,
+        },
+        {
+            "ticker": "GOV",
+            "name": "Schwab Government Money Fund",
+            "yield": 4.2,
+            "category": "Government",
+            "usTreasuryDebt": 0.2,
+            "usGovernmentAgencyDebt": 0.1,
+        },
+        {"ticker": "PRM", "name": "Prime Fund", "yield": 4.5, "category": "Prime"},
+    ]
+    prepare_funds(funds)
+    for state in ["NY", "CA", "NJ", "WA", "GEN"]:
+        expected = sorted(
+            (process_fund(f, state, 0.24, 0.06) for f in funds),
+            key=lambda x: x["tax_equivalent_yield"],
+            reverse=True,
+        )
+        ranked = rank_funds(funds, state, 0.24, 0.06, top_n=3)
+        assert [f["ticker"] for f in ranked] == [f["ticker"] for f in expected[:3]]
+        for got, want in zip(ranked, expected):
+            assert got["after_tax_yield"] == pytest.approx(want["after_tax_yield"])
+            assert got["tax_equivalent_yield"] == pytest.approx(
+                want["tax_equivalent_yield"]
+            )
+
+
+def test_numpy_fund_yields_matches_process_fund():
+    funds = [
+        {"name": "Prime Fund", "yield": 4.5},
+        {
+            "name": "New Jersey Muni",
+            "category": "SingleState",
+            "yield": 2.9,
+            "variableRateDemandNote": 0.7,
+        },
+        {
+            "name": "California Muni",
+            "category": "SingleState",
+            "yield": 3.1,
+            "variableRateDemandNote": 0.95,
+        },
+        {"name": "Treasury Fund", "yield": 4.1, "usTreasuryDebt": 0.45},
+        {"name": "Government Fund", "yield": 4.2, "usGovernmentAgencyDebt": 0.8},
+    ]
+    prepare_funds(funds)
+    for state, fed_rate, state_rate in [("NJ", 0.24, 0.06), ("CA", 0.6, 0.5)]:
+        frame = build_fund_frame(funds, state)
+        rates = RateContext.from_rates(fed_rate, state_rate)
+        after_tax, tax_equiv = _numpy_fund_yields(frame, state, rates)
+        for fund, aty, tey in zip(funds, after_tax, tax_equiv):
+            expected = process_fund(fund, state, fed_rate, state_rate)
+            assert aty == pytest.approx(expected["after_tax_yield"])
+            assert tey == pytest.approx(expected["tax_equivalent_yield"])
+
+
+def test_rank_funds_keeps_input_order_for_ties():
+    yields = [4.0, 5.0, 4.0, 3.0, 5.0, 4.0, 4.0]
+    funds = [
+        {"ticker": str(i), "name": f"Fund {i}", "yield": y}
+        for i, y in enumerate(yields)
+    ]
+    prepare_funds(funds)
+    ranked = rank_funds(funds, "WA", 0.24, 0.0, top_n=4)
+    assert [f["ticker"] for f in ranked] == ["1", "4", "0", "2"]
+
+
+def test_rank_funds_filters_like_filter_funds():
+    funds = [
+        {"ticker": "A", "name": "Vanguard Federal", "minimumInitialInvestment": 3000},
+        {"ticker": "B", "name": "VANGUARD Treasury", "minimumInitialInvestment": 0},
+        {"ticker": "C", "name": "Fidelity Treasury", "minimumInitialInvestment": 0},
+        {"ticker": "D", "name": "Vanguard Prime", "minimumInitialInvestment": 1e6},
+    ]
+    for i, fund in enumerate(funds):
+        fund["yield"] = 4.0 + i / 10
+    prepare_funds(funds)
+
+    for amount, issuer in [(5000, "vanguard"), (5000, None), (0, "Treasury")]:
+        expected = {f["ticker"] for f in funds if filter_funds(f, amount, issuer)}
+        ranked = rank_funds(funds, "WA", 0.24, 0.0, amount, issuer)
+        assert {f["ticker"] for f in ranked} == expected
+
+
+def test_config_save_skips_unchanged(tmp_path, mocker):
+    config_path = tmp_path / "config.json"
+    mocker.patch("optimizer.CONFIG_PATH", str(config_path))
+    from optimizer import Config
+
+    config = Config(federal_tax_rate=0.24, state_tax_rate=0.05, state="NY")
+    config.save()
+    written = config_path.read_bytes()
+
+    loaded = Config.load()
+    assert loaded == config
+    open_spy = mocker.patch("builtins.open", wraps=open)
+    loaded.save()
+    open_spy.assert_not_called()
+
+    loaded.state_tax_rate = 0.06
+    loaded.save()
+    assert config_path.read_bytes() != written
+    assert Config.load().state_tax_rate == 0.06
+
+
 def test_main_top_5(mocker, capsys):
     # Mock data
     mock_fund_data = [
@@ -86,7 +247,7 @@ def test_main_top_5(mocker, capsys):
             "investorType": "Retail",
         }
     ]
-    mocker.patch("optimizer.get_fund_data", return_value=mock_fund_data)
+    mocker.patch("optimizer.get_fund_data", return_value=(mock_fund_data, None))
 
     # Mock sys.argv
     import sys
@@ -122,3 +283,24 @@ def test_main_top_5(mocker, capsys):
     captured = capsys.readouterr()
     assert "1" in captured.out
     assert "HIGH" in captured.out
+
+
+def test_main_reports_fetch_error(mocker, capsys):
+    mocker.patch(
+        "optimizer.get_fund_data", return_value=(None, "Failed to retrieve data: boom")
+    )
+    import sys
+
+    mocker.patch.object(sys, "argv", ["optimizer.py", "--investment_amount", "5000"])
+    from optimizer import Config
+
+    mocker.patch("optimizer.get_tax_info", return_value=(0.20, 0.05, "WA"))
+    mocker.patch("optimizer.Config.save", return_value=None)
+    mocker.patch("optimizer.Config.load", return_value=Config())
+    mocker.patch("optimizer.Prompt.ask", return_value="")
+
+    from optimizer import main
+
+    main()
+
+    assert "Failed to retrieve data: boom" in capsys.readouterr().out